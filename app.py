@@ -1,8 +1,19 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from model import AssessmentRecommender
+from collections import OrderedDict
+import numpy as np
+import hashlib
+import orjson
+import threading
+import time
 import os
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
@@ -10,6 +21,24 @@ CORS(app)  # Enable CORS for all routes
 MODEL_PATH = 'assessment_recommender.pkl'
 recommender = None
 
+# In-process LRU of exact matches, keyed on the SHA-1 of the job description
+# so cached entries never hold arbitrarily large request bodies
+LOCAL_CACHE_SIZE = 1024
+local_cache = OrderedDict()
+local_cache_lock = threading.Lock()
+
+# Optional shared cache; only used when REDIS_URL is set
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_TTL = 300
+REDIS_TIMEOUT = 0.2  # Seconds; an unreachable cache must not stall requests
+REDIS_RETRY_AFTER = 30  # Seconds to bypass Redis after a failure
+redis_client = redis.Redis.from_url(
+    REDIS_URL,
+    socket_connect_timeout=REDIS_TIMEOUT,
+    socket_timeout=REDIS_TIMEOUT
+) if redis is not None and REDIS_URL else None
+redis_disabled_until = 0.0
+
 def load_model():
     global recommender
     if os.path.exists(MODEL_PATH):
@@ -19,6 +48,73 @@ def load_model():
         recommender.fit('shl_assessments_rag.csv')
         recommender.save_model(MODEL_PATH)
 
+def semantic_cache_key(description_vector):
+    """Build a cache key from a coarsened query vector.
+
+    Weights are rounded so near-identical job descriptions share an entry.
+    """
+    vector = description_vector.tocsr()
+    order = np.argsort(vector.indices)
+    digest = hashlib.sha1()
+    digest.update(vector.indices[order].tobytes())
+    digest.update(np.round(vector.data[order], 2).astype(np.float32).tobytes())
+    # Prefix with the model fingerprint so retrained models sharing the same
+    # Redis never serve each other's results
+    return f"recommend:{recommender.fingerprint}:{digest.hexdigest()}"
+
+def cached_recommendations(job_description):
+    """Get recommendations, caching exact matches in-process by description digest."""
+    key = hashlib.sha1(job_description.encode()).hexdigest()
+    with local_cache_lock:
+        if key in local_cache:
+            local_cache.move_to_end(key)
+            return local_cache[key]
+    
+    recommendations = shared_cached_recommendations(job_description)
+    
+    with local_cache_lock:
+        local_cache[key] = recommendations
+        local_cache.move_to_end(key)
+        if len(local_cache) > LOCAL_CACHE_SIZE:
+            local_cache.popitem(last=False)
+    
+    return recommendations
+
+def redis_available():
+    """Return whether Redis is configured and not in a post-failure backoff."""
+    return redis_client is not None and time.monotonic() >= redis_disabled_until
+
+def disable_redis(action, error):
+    """Bypass Redis for REDIS_RETRY_AFTER seconds after a failed call."""
+    global redis_disabled_until
+    redis_disabled_until = time.monotonic() + REDIS_RETRY_AFTER
+    app.logger.warning(f"Redis {action} failed, bypassing cache for {REDIS_RETRY_AFTER}s: {error}")
+
+def shared_cached_recommendations(job_description):
+    """Get recommendations, caching near matches in Redis when it is configured."""
+    description_vector = recommender.transform_query(job_description)
+    
+    if not redis_available():
+        return recommender.get_recommendations_for_vector(description_vector)
+    
+    key = semantic_cache_key(description_vector)
+    try:
+        cached = redis_client.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+    except redis.RedisError as e:
+        disable_redis("lookup", e)
+    
+    recommendations = recommender.get_recommendations_for_vector(description_vector)
+    
+    if redis_available():
+        try:
+            redis_client.setex(key, CACHE_TTL, orjson.dumps(recommendations))
+        except redis.RedisError as e:
+            disable_redis("write", e)
+    
+    return recommendations
+
 @app.route('/api/recommend', methods=['POST'])
 def get_recommendations():
     try:
@@ -32,12 +128,13 @@ def get_recommendations():
             }), 400
         
         # Get recommendations
-        recommendations = recommender.get_recommendations(job_description)
+        recommendations = cached_recommendations(job_description)
         
-        return jsonify({
+        # orjson serializes much faster than the stdlib encoder behind jsonify
+        return Response(orjson.dumps({
             'success': True,
             'recommendations': recommendations
-        })
+        }), mimetype='application/json')
         
     except Exception as e:
         return jsonify({
@@ -54,6 +151,5 @@ def health_check():
 load_model()
 
 if __name__ == '__main__':
-    # Load the model before starting the server
-    #load_model()
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    # Local development only; use gunicorn (see gunicorn_conf.py) in production
+    app.run(port=5000)
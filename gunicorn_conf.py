@@ -0,0 +1,17 @@
+# Gunicorn configuration for serving the recommender API.
+# Run with: gunicorn -c gunicorn_conf.py app:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Preload the app so the model is loaded once in the master process and
+# shared copy-on-write with the forked workers
+preload_app = True
+
+# cpu_count() reports the host's CPUs rather than the container's limit, so
+# deploys should size the pool through WEB_CONCURRENCY
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = 4
+timeout = 30
@@ -1,50 +1,84 @@
+# Use Intel's optimized scikit-learn kernels when the extension is installed;
+# patching must happen before any sklearn estimators are imported
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
+
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from numba import njit
 import pickle
+import hashlib
 import joblib
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-import nltk
-import re
+import threading
+from scipy.sparse import csr_matrix
+
+# CSR component arrays of the TF-IDF matrix, each saved next to the model file
+MATRIX_ARRAYS = ('data', 'indices', 'indptr')
 
-# Download required NLTK data
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('averaged_perceptron_tagger')
+def matrix_array_path(filepath, name):
+    """Return the .npy path used for one CSR component array of a saved model."""
+    return f"{filepath}.{name}.npy"
+
+@njit(cache=True)
+def top_k_indices(scores, k):
+    """Return the indices of the k highest scores, best first.
+
+    Keeps a small sorted buffer while scanning the scores once, so the full
+    score array is never sorted or copied.
+    """
+    k = max(0, min(k, scores.shape[0]))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    top_indices = np.empty(k, dtype=np.int64)
+    top_scores = np.empty(k, dtype=scores.dtype)
+    size = 0
+    for i in range(scores.shape[0]):
+        score = scores[i]
+        if size < k:
+            pos = size
+            size += 1
+        elif score > top_scores[k - 1]:
+            pos = k - 1
+        else:
+            continue
+        # Shift lower scores down to make room, insertion-sort style
+        while pos > 0 and top_scores[pos - 1] < score:
+            top_scores[pos] = top_scores[pos - 1]
+            top_indices[pos] = top_indices[pos - 1]
+            pos -= 1
+        top_scores[pos] = score
+        top_indices[pos] = i
+    return top_indices
 
 class AssessmentRecommender:
     def __init__(self):
         self.vectorizer = TfidfVectorizer(
+            # The vectorizer's analyzer lowercases, tokenizes and drops
+            # stopwords itself, identically for the corpus and queries
+            lowercase=True,
             stop_words='english',
+            token_pattern=r'[a-zA-Z]{2,}',
             max_features=5000,
-            ngram_range=(1, 2)
+            ngram_range=(1, 2),
+            # float32 halves the bytes streamed through the similarity matvec
+            dtype=np.float32
         )
         self.assessments_df = None
         self.tfidf_matrix = None
+        self.result_columns = None
+        self.fingerprint = None
+        # Reusable similarity score buffer; the lock keeps concurrent
+        # requests on threaded workers from overwriting each other's scores
+        self._score_buffer = None
+        self._score_lock = threading.Lock()
         
-    def preprocess_text(self, text):
-        """Clean and preprocess text data."""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        
-        # Tokenize
-        tokens = word_tokenize(text)
-        
-        # Remove stopwords
-        stop_words = set(stopwords.words('english'))
-        tokens = [token for token in tokens if token not in stop_words]
-        
-        # Join tokens back into text
-        return ' '.join(tokens)
-    
     def fit(self, csv_path):
         """Train the model using the assessment data."""
-        # Load and preprocess the data
+        # Load the data
         self.assessments_df = pd.read_csv(csv_path)
         
         # Create a combined text field for vectorization
@@ -53,49 +87,101 @@ class AssessmentRecommender:
             self.assessments_df['Job Level'].fillna('')
         )
         
-        # Preprocess the combined features
-        self.assessments_df['combined_features'] = self.assessments_df['combined_features'].apply(self.preprocess_text)
+        # Create TF-IDF matrix (rows are already L2-normalized by the vectorizer)
+        self.tfidf_matrix = self.vectorizer.fit_transform(self.assessments_df['combined_features']).tocsr()
         
-        # Create TF-IDF matrix
-        self.tfidf_matrix = self.vectorizer.fit_transform(self.assessments_df['combined_features'])
+        self._build_result_columns()
+        self._allocate_score_buffer()
+        self._compile_top_k()
+        self._compute_fingerprint()
         
         return self
     
+    def _build_result_columns(self):
+        """Precompute the cleaned output fields as one array per column.
+
+        Recommendations then read values by plain array indexing instead of
+        building a pandas Series for every returned row.
+        """
+        df = self.assessments_df
+        self.result_columns = {
+            'name': df['Assessment Name'].to_numpy(),
+            'url': df['URL'].fillna('').to_numpy(),
+            'remote_testing': (df['Remote Testing'] == 'Yes').map({True: 'Yes', False: 'No'}).to_numpy(),
+            'duration': df['Duration'].fillna('Not specified').to_numpy()
+        }
+    
+    def _allocate_score_buffer(self):
+        """Allocate the per-model similarity score buffer reused by every query."""
+        self._score_buffer = np.empty(self.tfidf_matrix.shape[0], dtype=self.tfidf_matrix.dtype)
+    
+    def _compute_fingerprint(self):
+        """Digest the TF-IDF matrix and assessment data to identify this model.
+
+        Shared caches use it to keep results from different models apart.
+        """
+        digest = hashlib.sha1()
+        for name in MATRIX_ARRAYS:
+            digest.update(np.ascontiguousarray(getattr(self.tfidf_matrix, name)).tobytes())
+        digest.update(pd.util.hash_pandas_object(self.assessments_df, index=True).to_numpy().tobytes())
+        self.fingerprint = digest.hexdigest()[:16]
+    
+    def _compile_top_k(self):
+        """Compile top_k_indices for the score dtype ahead of the first query.
+
+        Under gunicorn's preload_app this runs in the master, so forked workers
+        inherit the compiled kernel instead of each compiling it on a live request.
+        """
+        top_k_indices(np.zeros(1, dtype=self.tfidf_matrix.dtype), 1)
+    
+    def transform_query(self, job_description):
+        """Vectorize a job description into the fitted TF-IDF space."""
+        # Transform the job description using the fitted vectorizer
+        return self.vectorizer.transform([job_description])
+    
     def get_recommendations(self, job_description, top_n=10):
         """Get top N assessment recommendations for a job description."""
-        # Preprocess the input job description
-        processed_description = self.preprocess_text(job_description)
-        
-        # Transform the job description using the fitted vectorizer
-        description_vector = self.vectorizer.transform([processed_description])
-        
-        # Calculate similarity scores
-        similarity_scores = cosine_similarity(description_vector, self.tfidf_matrix)
+        description_vector = self.transform_query(job_description)
+        return self.get_recommendations_for_vector(description_vector, top_n)
+    
+    def get_recommendations_for_vector(self, description_vector, top_n=10):
+        """Get top N assessment recommendations for an already vectorized query."""
+        # Match the matrix dtype so the product can be written into the buffer
+        description_vector = description_vector.astype(self.tfidf_matrix.dtype, copy=False)
         
-        # Get indices of top N similar assessments
-        top_indices = similarity_scores[0].argsort()[::-1][:top_n]
+        with self._score_lock:
+            # Calculate similarity scores; both sides are L2-normalized, so the
+            # cosine similarity reduces to a single sparse matrix-vector product
+            similarity_scores = self.tfidf_matrix @ description_vector.T
+            similarity_scores.toarray(out=self._score_buffer.reshape(-1, 1))
+            
+            # Get indices of top N similar assessments
+            top_indices = top_k_indices(self._score_buffer, top_n)
         
         # Create recommendations list with similarity scores
         recommendations = []
         for idx in top_indices:
-            assessment = self.assessments_df.iloc[idx]
             recommendations.append({
-                'name': assessment['Assessment Name'],
-                'url': assessment['URL'] if not pd.isna(assessment['URL']) else '',
-                'remote_testing': 'Yes' if assessment['Remote Testing'] == 'Yes' else 'No',
-                'duration': assessment['Duration'] if not pd.isna(assessment['Duration']) else 'Not specified'
+                field: values[idx] for field, values in self.result_columns.items()
             })
         
         return recommendations
     
     def save_model(self, filepath):
         """Save the trained model to a file."""
+        # The TF-IDF matrix goes into plain .npy files so that load_model can
+        # memory-map it and every worker process shares one page-cached copy
+        for name in MATRIX_ARRAYS:
+            np.save(matrix_array_path(filepath, name), getattr(self.tfidf_matrix, name))
+        
         model_data = {
             'vectorizer': self.vectorizer,
             'assessments_df': self.assessments_df,
-            'tfidf_matrix': self.tfidf_matrix
+            'tfidf_shape': self.tfidf_matrix.shape
         }
-        joblib.dump(model_data, filepath)
+        # LZ4 shrinks the file several-fold at almost no CPU cost, so cold
+        # starts spend less time on disk I/O
+        joblib.dump(model_data, filepath, compress=('lz4', 3), protocol=pickle.HIGHEST_PROTOCOL)
     
     @classmethod
     def load_model(cls, filepath):
@@ -104,7 +190,21 @@ class AssessmentRecommender:
         model_data = joblib.load(filepath)
         model.vectorizer = model_data['vectorizer']
         model.assessments_df = model_data['assessments_df']
-        model.tfidf_matrix = model_data['tfidf_matrix']
+        if 'tfidf_matrix' in model_data:
+            # Model saved before the matrix was split out into .npy files
+            model.tfidf_matrix = model_data['tfidf_matrix']
+        else:
+            data, indices, indptr = (
+                np.load(matrix_array_path(filepath, name), mmap_mode='r')
+                for name in MATRIX_ARRAYS
+            )
+            model.tfidf_matrix = csr_matrix(
+                (data, indices, indptr), shape=model_data['tfidf_shape'], copy=False
+            )
+        model._build_result_columns()
+        model._allocate_score_buffer()
+        model._compile_top_k()
+        model._compute_fingerprint()
         return model
 
 # Train and save the model
@@ -5,7 +5,11 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import ahocorasick
 import pandas as pd
+import sqlite3
+import threading
 import time
 import json
 import re
@@ -22,6 +26,74 @@ BASE_URL = "https://www.shl.com"
 CATALOG_URL = "https://www.shl.com/solutions/products/product-catalog/"
 OUTPUT_FILE = "shl_assessments_rag.csv"
 CACHE_FILE = "assessment_cache.json"
+CACHE_DB = "assessment_cache.sqlite"
+CACHE_COMMIT_EVERY = 20  # Scraped pages per SQLite commit
+MAX_WORKERS = 8  # Number of concurrent headless browsers
+
+# Regex patterns, compiled once at import rather than on every page
+COMPLETION_TIME_PATTERN = re.compile(r'Approximate Completion Time in minutes\s*=\s*(\d+)', re.IGNORECASE)
+
+# Duration patterns in priority order (the first pattern that matches wins)
+SECTION_DURATION_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'completion time.*?(\d+)\s*minutes',
+        r'duration.*?(\d+)\s*minutes',
+        r'takes.*?(\d+)\s*minutes',
+        r'(\d+)\s*minutes to complete',
+        r'(\d+)\s*min'
+    ]
+]
+DURATION_PATTERNS = [
+    COMPLETION_TIME_PATTERN,
+    *SECTION_DURATION_PATTERNS,
+    re.compile(r'approximately\s*(\d+)\s*minutes', re.IGNORECASE)
+]
+
+# Indicator patterns only need to know whether any alternative matches,
+# so each group is a single alternation scanned in one pass
+REMOTE_PATTERN = re.compile(
+    r'remote\s+testing|online\s+assessment|virtual\s+assessment|web-based\s+test',
+    re.IGNORECASE
+)
+ADAPTIVE_PATTERN = re.compile(
+    r'adaptive\s+testing|irt(?:\s+|\s*-\s*)based|item\s+response\s+theory|computer\s+adaptive',
+    re.IGNORECASE
+)
+REMOTE_TEXT_PATTERN = re.compile(r'remote|online|virtual', re.IGNORECASE)
+ADAPTIVE_TEXT_PATTERN = re.compile(r'adaptive|irt|item response theory', re.IGNORECASE)
+
+# Keywords that indicate a job level in a key-feature section, in priority order
+JOB_LEVEL_KEYWORDS = {
+    "entry": ["entry", "junior", "beginner", "graduate"],
+    "professional": ["professional", "intermediate", "experienced"],
+    "manager": ["manager", "management", "supervisor", "lead"],
+    "executive": ["executive", "senior", "director", "leadership"]
+}
+# Aho-Corasick automaton that finds every keyword in a single pass over the text
+JOB_LEVEL_AUTOMATON = ahocorasick.Automaton()
+for level, keywords in JOB_LEVEL_KEYWORDS.items():
+    for keyword in keywords:
+        JOB_LEVEL_AUTOMATON.add_word(keyword, level)
+JOB_LEVEL_AUTOMATON.make_automaton()
+
+# Phrases that indicate a job level in the page body, in priority order
+JOB_LEVEL_PHRASES = {
+    "Entry": ["entry level position", "entry-level role", "graduate position", "junior role"],
+    "Professional": ["professional level", "experienced professional", "mid-level position"],
+    "Manager": ["managerial position", "management role", "supervisory position"],
+    "Executive": ["executive level", "senior position", "leadership role"]
+}
+# One named group per level so a single scan finds every level mentioned
+JOB_LEVEL_PHRASE_PATTERN = re.compile("|".join(
+    f"(?P<{level}>{'|'.join(re.escape(phrase) for phrase in phrases)})"
+    for level, phrases in JOB_LEVEL_PHRASES.items()
+))
+
+# Each worker thread lazily gets its own WebDriver; all of them are tracked
+# so they can be shut down once scraping finishes
+_thread_local = threading.local()
+_worker_drivers = []
+_worker_drivers_lock = threading.Lock()
 
 # Setup Selenium
 def setup_driver():
@@ -122,42 +194,18 @@ def extract_features_with_rag(text):
     
     try:
         # Extract duration using regex patterns
-        duration_patterns = [
-            r'Approximate Completion Time in minutes\s*=\s*(\d+)',
-            r'completion time.*?(\d+)\s*minutes',
-            r'duration.*?(\d+)\s*minutes',
-            r'takes.*?(\d+)\s*minutes',
-            r'(\d+)\s*minutes to complete',
-            r'(\d+)\s*min',
-            r'approximately\s*(\d+)\s*minutes'
-        ]
-        
-        for pattern in duration_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in DURATION_PATTERNS:
+            match = pattern.search(text)
             if match:
                 features["duration"] = f"{match.group(1)} minutes"
                 break
         
         # Check for remote testing indicators
-        remote_patterns = [
-            r'remote\s+testing',
-            r'online\s+assessment',
-            r'virtual\s+assessment',
-            r'web-based\s+test'
-        ]
-        
-        if any(re.search(pattern, text, re.IGNORECASE) for pattern in remote_patterns):
+        if REMOTE_PATTERN.search(text):
             features["remote"] = "Yes"
         
         # Check for adaptive testing indicators
-        adaptive_patterns = [
-            r'adaptive\s+testing',
-            r'irt(\s+|\s*-\s*)based',
-            r'item\s+response\s+theory',
-            r'computer\s+adaptive'
-        ]
-        
-        if any(re.search(pattern, text, re.IGNORECASE) for pattern in adaptive_patterns):
+        if ADAPTIVE_PATTERN.search(text):
             features["adaptive"] = "Yes"
         
         return features
@@ -176,11 +224,16 @@ def parse_assessment_page(driver, url):
         )
         
         # Get the page source after JavaScript has rendered
-        soup = BeautifulSoup(driver.page_source, "html.parser")
+        html = driver.page_source
+        soup = BeautifulSoup(html, "html.parser")
         
         # Extract title
         name = soup.find("h1").text.strip() if soup.find("h1") else "N/A"
         
+        # Extract the page text once and reuse it for every text search
+        page_text = soup.get_text()
+        page_text_lower = page_text.lower()
+        
         # Initialize assessment data
         assessment_data = {
             "Assessment Name": name,
@@ -192,17 +245,11 @@ def parse_assessment_page(driver, url):
         }
         
         # Look for duration in the page content
-        # First try to find the exact completion time text
-        completion_time_pattern = re.compile(r'Approximate Completion Time in minutes\s*=\s*(\d+)', re.IGNORECASE)
-        
-        # Search in all text elements
-        for element in soup.find_all(text=True):
-            if element.strip():  # Skip empty text nodes
-                match = completion_time_pattern.search(element.strip())
-                if match:
-                    minutes = match.group(1)
-                    assessment_data["Duration"] = f"{minutes} minutes"
-                    break
+        # First try to find the exact completion time text with a single scan
+        # of the raw HTML rather than walking every text node of the tree
+        match = COMPLETION_TIME_PATTERN.search(html)
+        if match:
+            assessment_data["Duration"] = f"{match.group(1)} minutes"
         
         # If duration not found, try alternative patterns
         if assessment_data["Duration"] == "N/A":
@@ -211,16 +258,8 @@ def parse_assessment_page(driver, url):
             for section in detail_sections:
                 text = section.get_text(strip=True)
                 # Try different duration patterns
-                duration_patterns = [
-                    r'completion time.*?(\d+)\s*minutes',
-                    r'duration.*?(\d+)\s*minutes',
-                    r'takes.*?(\d+)\s*minutes',
-                    r'(\d+)\s*minutes to complete',
-                    r'(\d+)\s*min'
-                ]
-                
-                for pattern in duration_patterns:
-                    match = re.search(pattern, text.lower())
+                for pattern in SECTION_DURATION_PATTERNS:
+                    match = pattern.search(text)
                     if match:
                         assessment_data["Duration"] = f"{match.group(1)} minutes"
                         break
@@ -247,15 +286,9 @@ def parse_assessment_page(driver, url):
             # Check for job level in the text
             if "level" in text or "seniority" in text or "position" in text:
                 # Look for specific job level keywords
-                job_levels = {
-                    "entry": ["entry", "junior", "beginner", "graduate"],
-                    "professional": ["professional", "intermediate", "experienced"],
-                    "manager": ["manager", "management", "supervisor", "lead"],
-                    "executive": ["executive", "senior", "director", "leadership"]
-                }
-                
-                for level, keywords in job_levels.items():
-                    if any(keyword in text.lower() for keyword in keywords):
+                found_levels = {level for _, level in JOB_LEVEL_AUTOMATON.iter(text)}
+                for level in JOB_LEVEL_KEYWORDS:
+                    if level in found_levels:
                         assessment_data["Job Level"] = level.title()
                         break
         
@@ -274,16 +307,11 @@ def parse_assessment_page(driver, url):
                 break
         
         # 4. Look in the page content
-        content = soup.get_text().lower()
-        job_level_phrases = {
-            "Entry": ["entry level position", "entry-level role", "graduate position", "junior role"],
-            "Professional": ["professional level", "experienced professional", "mid-level position"],
-            "Manager": ["managerial position", "management role", "supervisory position"],
-            "Executive": ["executive level", "senior position", "leadership role"]
+        found_levels = {
+            match.lastgroup for match in JOB_LEVEL_PHRASE_PATTERN.finditer(page_text_lower)
         }
-        
-        for level, phrases in job_level_phrases.items():
-            if any(phrase in content for phrase in phrases):
+        for level in JOB_LEVEL_PHRASES:
+            if level in found_levels:
                 assessment_data["Job Level"] = level
                 break
         
@@ -297,22 +325,19 @@ def parse_assessment_page(driver, url):
         
         # If no explicit remote indicator found, check text content
         if assessment_data["Remote Testing"] == "No":
-            remote_text = soup.find_all(string=re.compile(r'remote|online|virtual', re.IGNORECASE))
+            remote_text = soup.find_all(string=REMOTE_TEXT_PATTERN)
             if remote_text:
                 assessment_data["Remote Testing"] = "Yes"
         
         # Check for adaptive support
-        adaptive_indicators = soup.find_all(string=re.compile(r'adaptive|irt|item response theory', re.IGNORECASE))
+        adaptive_indicators = soup.find_all(string=ADAPTIVE_TEXT_PATTERN)
         if adaptive_indicators:
             assessment_data["Adaptive Support"] = "Yes"
         
         # If RAG features are still needed, use them as a fallback
         if assessment_data["Duration"] == "N/A":
-            # Extract all text content for RAG processing
-            content = soup.get_text()
-            
             # Extract features using RAG
-            features = extract_features_with_rag(content)
+            features = extract_features_with_rag(page_text)
             
             # Use RAG features as fallback
             if assessment_data["Duration"] == "N/A":
@@ -328,15 +353,60 @@ def parse_assessment_page(driver, url):
         logger.error(f"Error parsing assessment page {url}: {e}")
         return None
 
-def load_cache():
-    """Load cached assessment data if available."""
+def get_worker_driver():
+    """Return the WebDriver for the current thread, creating it on first use."""
+    driver = getattr(_thread_local, "driver", None)
+    if driver is None:
+        driver = setup_driver()
+        _thread_local.driver = driver
+        with _worker_drivers_lock:
+            _worker_drivers.append(driver)
+    return driver
+
+def close_worker_drivers():
+    """Quit all WebDrivers created by worker threads."""
+    with _worker_drivers_lock:
+        for driver in _worker_drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f"Error closing driver: {e}")
+        _worker_drivers.clear()
+
+def scrape_assessment(link):
+    """Scrape a single assessment page using the current thread's driver."""
+    item = parse_assessment_page(get_worker_driver(), link)
+    time.sleep(2)  # Polite delay between requests from the same browser
+    return item
+
+def open_cache_db():
+    """Open the SQLite cache store, creating its table if needed."""
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS cache (url TEXT PRIMARY KEY, data TEXT)")
+    return conn
+
+def load_cache(conn):
+    """Load cached assessment data from the JSON snapshot and the SQLite store."""
+    cache = {}
     if os.path.exists(CACHE_FILE):
         try:
             with open(CACHE_FILE, 'r') as f:
-                return json.load(f)
+                cache = json.load(f)
         except Exception as e:
             logger.error(f"Error loading cache: {e}")
-    return {}
+    try:
+        for url, item in conn.execute("SELECT url, data FROM cache"):
+            cache[url] = json.loads(item)
+    except Exception as e:
+        logger.error(f"Error loading cache database: {e}")
+    return cache
+
+def cache_item(conn, url, item):
+    """Insert or update a single scraped assessment in the SQLite store."""
+    conn.execute(
+        "INSERT OR REPLACE INTO cache (url, data) VALUES (?, ?)",
+        (url, json.dumps(item))
+    )
 
 def save_cache(cache_data):
     """Save assessment data to cache."""
@@ -351,35 +421,52 @@ def scrape_catalog():
     """Main function to scrape the assessment catalog using RAG."""
     logger.info("Starting catalog scraping with RAG...")
     
-    # Initialize the driver
+    # Initialize the driver and the cache store
     driver = setup_driver()
+    cache_db = open_cache_db()
     
     try:
         # Load cache
-        cache = load_cache()
+        cache = load_cache(cache_db)
         
         # Get assessment links
         links = get_assessment_links(driver)
         logger.info(f"Found {len(links)} assessments to process")
         
-        data = []
+        # Check cache first
+        pending = []
         for i, link in enumerate(links):
-            # Check cache first
             if link in cache:
                 logger.info(f"[{i+1}/{len(links)}] Using cached data for: {link}")
-                data.append(cache[link])
-                continue
-            
-            try:
-                logger.info(f"[{i+1}/{len(links)}] Scraping: {link}")
-                item = parse_assessment_page(driver, link)
-                if item:
-                    data.append(item)
-                    cache[link] = item  # Update cache
-                    save_cache(cache)  # Save cache after each successful scrape
-                time.sleep(2)  # Polite delay between requests
-            except Exception as e:
-                logger.error(f"Failed to scrape {link}: {e}")
+            else:
+                pending.append(link)
+        
+        # Scrape uncached pages concurrently, one browser per worker thread
+        logger.info(f"Scraping {len(pending)} pages with {MAX_WORKERS} workers")
+        uncommitted = 0
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {executor.submit(scrape_assessment, link): link for link in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                link = futures[future]
+                try:
+                    item = future.result()
+                    logger.info(f"[{done}/{len(pending)}] Scraped: {link}")
+                    if item:
+                        cache[link] = item  # Update cache
+                        cache_item(cache_db, link, item)
+                        uncommitted += 1
+                        if uncommitted >= CACHE_COMMIT_EVERY:
+                            cache_db.commit()
+                            uncommitted = 0
+                except Exception as e:
+                    logger.error(f"Failed to scrape {link}: {e}")
+        
+        # Persist the remaining inserts and refresh the JSON snapshot once
+        cache_db.commit()
+        save_cache(cache)
+        
+        # Keep the catalog order in the output
+        data = [cache[link] for link in links if link in cache]
         
         # Create DataFrame and save to CSV
         df = pd.DataFrame(data)
@@ -387,8 +474,10 @@ def scrape_catalog():
         logger.info(f"✅ Saved {len(data)} assessments to {OUTPUT_FILE}")
     
     finally:
-        # Always close the driver
+        # Always close the drivers
+        close_worker_drivers()
         driver.quit()
+        cache_db.close()
 
 if __name__ == "__main__":
     scrape_catalog() 
\ No newline at end of file